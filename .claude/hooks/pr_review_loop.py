@@ -5,19 +5,25 @@ StopHook for continuous PR review workflow.
 When agent stops:
 - No PR session → tell agent to commit changes and use request_review
 - PR with unresolved comments → tell agent to address them
-- PR idle → poll every 5 min, kill after 12h
+- PR idle → wait for feedback changes, kill after 12h
 - PR merged/closed → exit cleanly
 """
 
+import atexit
+import collections
+import functools
 import hashlib
+import http.client
 import json
 import os
+import shlex
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
 from pathlib import Path
 from typing import Any, NoReturn
 
@@ -26,16 +32,62 @@ from typing import Any, NoReturn
 # =============================================================================
 
 DIFFER_URL = os.environ.get("DIFFER_URL", "http://localhost:8576")
-POLL_INTERVAL = 60  # 1 minute
+GIT = shutil.which("git") or "git"  # Resolved once so each exec skips the PATH search
+# Environment for every git exec: don't take optional locks (so `git status`
+# never rewrites the index under the agent) and never wait on a credential prompt
+GIT_ENV = {**os.environ, "GIT_OPTIONAL_LOCKS": "0", "GIT_TERMINAL_PROMPT": "0"}
+MIN_POLL_INTERVAL = 2  # First fallback sleep when the server can't be watched
+POLL_INTERVAL = 60  # Fallback sleeps double up to this cap (1 minute)
+# Seconds a watch request waits for feedback changes. Keep at or below the
+# server's :poller-grace-ms - the GitHub poller only counts a watch when it starts
+WATCH_TIMEOUT = 300
+FEEDBACK_TTL = 900  # Reuse feedback this long while watches see no events
+PREFLIGHT_TIMEOUT = 30  # Bounds the `git fetch` inside the pre-flight script
 MAX_IDLE = 43200  # 12 hours
 MAX_REPEATED_BLOCKS = 3  # Give up if same block reason repeats this many times
+MAX_LISTED_CHANGES = 20  # Uncommitted changes shown in the block message
+MAX_LISTED_COMMENTS = 10  # Unresolved comments shown in the block message
 BLOCK_HISTORY_FILE = Path("/tmp/pr_review_loop_block_history")
+MERGE_CACHE_FILE = Path("/tmp/pr_review_loop_mergecache.json")
+RESPONSE_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "differ"
+)
+VERDICT_DIR = RESPONSE_CACHE_DIR / "verdict"
+VERDICT_TTL = 5  # Seconds a verdict is replayed to back-to-back fires of the hook
+METRICS_FILE = (
+    Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+    / "differ"
+    / "metrics.jsonl"
+)
 
 COMMIT_REMINDER = (
     "IMPORTANT: Before requesting review, you must `git add` and `git commit` all changes. "
     "Commits are automatically pushed to the PR when you use request_review."
 )
 
+# =============================================================================
+# Metrics
+# =============================================================================
+
+# Per-run counts of api_calls, not_modified (304s), feedback_reused, verdict_replays
+# and poll iterations, appended to METRICS_FILE on exit for tuning the intervals
+_metrics: collections.Counter[str] = collections.Counter()
+_metrics_session_id = ""
+
+
+@atexit.register
+def _write_metrics() -> None:
+    if not _metrics:
+        return
+    record = {"ts": time.time(), "session_id": _metrics_session_id, **_metrics}
+    try:
+        METRICS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(METRICS_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
+
+
 # =============================================================================
 # Hook control flow (all exit the process)
 # =============================================================================
@@ -43,26 +95,33 @@ COMMIT_REMINDER = (
 
 def get_reason_hash(reason: str) -> str:
     """Hash a block reason for comparison (ignores minor variations)."""
-    return hashlib.md5(reason.encode()).hexdigest()[:16]
+    return hashlib.blake2b(reason.encode(), digest_size=8).hexdigest()
 
 
 def check_repeated_block(reason: str) -> bool:
-    """Check if this reason has been repeated too many times. Returns True if should allow."""
-    reason_hash = get_reason_hash(reason)
+    """Check if this reason has been repeated too many times. Returns True if should allow.
 
-    # Read existing history
-    try:
-        history = BLOCK_HISTORY_FILE.read_text().strip().split("\n")
-    except FileNotFoundError:
-        history = []
-
-    # Add current hash and keep last N entries
-    history.append(reason_hash)
-    history = history[-MAX_REPEATED_BLOCKS:]
-    BLOCK_HISTORY_FILE.write_text("\n".join(history))
+    The history file holds fixed-width records (hash + newline) for the
+    current streak of identical reasons only, so the streak length is just
+    how many records are in it.
+    """
+    record = f"{get_reason_hash(reason)}\n".encode()
+    record_size = len(record)
 
-    # Check if all recent entries are identical
-    if len(history) >= MAX_REPEATED_BLOCKS and len(set(history)) == 1:
+    fd = os.open(BLOCK_HISTORY_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        history = os.pread(fd, record_size * MAX_REPEATED_BLOCKS, 0)
+        if history[:record_size] == record:
+            offset = len(history)
+        else:
+            # Different reason - start a new streak
+            os.ftruncate(fd, 0)
+            offset = 0
+        os.pwrite(fd, record, offset)
+    finally:
+        os.close(fd)
+
+    if offset + record_size >= record_size * MAX_REPEATED_BLOCKS:
         BLOCK_HISTORY_FILE.unlink()
         print(
             f"Same block reason repeated {MAX_REPEATED_BLOCKS} times. Giving up.",
@@ -72,19 +131,59 @@ def check_repeated_block(reason: str) -> bool:
     return False
 
 
+# Where block()/allow() record their verdict for replay, set once main() knows the repo
+_verdict: tuple[Path, list[Any]] | None = None
+
+
 def block(reason: str) -> NoReturn:
     """Output block decision and exit. Agent will continue with given instructions."""
     if check_repeated_block(reason):
         allow()
+    save_verdict("block", reason)
     print(json.dumps({"decision": "block", "reason": reason}))
     sys.exit(0)
 
 
 def allow() -> NoReturn:
     """Allow agent to stop (normal exit)."""
+    save_verdict("allow")
     sys.exit(0)
 
 
+def save_verdict(decision: str, reason: str = "") -> None:
+    """Record the verdict so a repeat fire within VERDICT_TTL can replay it."""
+    if _verdict is None:
+        return
+    path, fingerprint = _verdict
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"fingerprint": fingerprint, "decision": decision, "reason": reason})
+        )
+    except OSError:
+        pass
+
+
+def replay_verdict(path: Path, fingerprint: list[Any]) -> None:
+    """Repeat the last verdict if it is recent and the repo hasn't changed since.
+
+    Returns if there is nothing to replay; otherwise exits via block()/allow().
+    """
+    try:
+        if time.time() - path.stat().st_mtime >= VERDICT_TTL:
+            return
+        verdict = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return
+    if not isinstance(verdict, dict) or verdict.get("fingerprint") != fingerprint:
+        return
+    print("Replaying verdict from a moment ago.", file=sys.stderr)
+    _metrics["verdict_replays"] += 1
+    if verdict.get("decision") == "block":
+        block(verdict.get("reason", ""))
+    allow()
+
+
 # =============================================================================
 # Hook input
 # =============================================================================
@@ -98,37 +197,78 @@ def read_hook_input() -> dict[str, Any]:
         return {}
 
 
+@functools.cache
 def is_disabled() -> bool:
     """Check if hook is disabled via PR_REVIEW_LOOP_DISABLED env var."""
     return os.environ.get("PR_REVIEW_LOOP_DISABLED", "").lower() in ("1", "true", "yes")
 
 
+def is_auto_exit_enabled() -> bool:
+    """Check if the hook should end the agent itself via PR_REVIEW_LOOP_AUTO_EXIT env var."""
+    return os.environ.get("PR_REVIEW_LOOP_AUTO_EXIT", "").lower() in ("1", "true", "yes")
+
+
 # =============================================================================
 # Git helpers (pure - no side effects)
 # =============================================================================
 
 
-def find_repo_root(start: Path | None = None) -> Path:
-    """Walk up from start (or cwd) to find git repo root."""
-    current = (start or Path.cwd()).resolve()
-    while current != current.parent:
-        if (current / ".git").exists():
+@functools.lru_cache(maxsize=8)
+def find_repo_root(start: str) -> str | None:
+    """Walk up from start (already resolved) to find git repo root, or None if not inside a repo.
+
+    Works on plain strings so each level costs one stat, without pathlib
+    re-parsing the path on every join.
+    """
+    current = start
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
             return current
-        current = current.parent
-    return start or Path.cwd()
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
 
+def find_git_dir(repo_path: str) -> str:
+    """Get the git dir for a repo root, following the `gitdir:` file of worktrees."""
+    dot_git = os.path.join(repo_path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git) as f:
+            line = f.readline().strip()
+    except OSError:
+        return dot_git
+    if line.startswith("gitdir:"):
+        return os.path.join(repo_path, line.removeprefix("gitdir:").strip())
+    return dot_git
 
-def is_git_repo(path: Path) -> bool:
-    """Check if path is inside a git repository."""
-    return (find_repo_root(path) / ".git").exists()
 
+def get_current_branch(repo_path: str) -> str:
+    """Get current git branch name, or empty string on failure.
+
+    Reads HEAD straight from the git dir, only spawning git if that fails.
+    Like `git rev-parse --abbrev-ref HEAD`, a detached HEAD gives "HEAD" and
+    an unborn branch (no commits yet) gives "".
+    """
+    try:
+        with open(os.path.join(find_git_dir(repo_path), "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        head = ""
+    if head.startswith("ref: refs/heads/"):
+        if git_batch(repo_path).resolve("HEAD") is None:
+            return ""  # Unborn branch
+        return head.removeprefix("ref: refs/heads/")
+    if len(head) in (40, 64) and all(c in "0123456789abcdef" for c in head):
+        return "HEAD"
 
-def get_current_branch(repo_path: Path) -> str:
-    """Get current git branch name, or empty string on failure."""
     try:
         return subprocess.check_output(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+            (GIT, "rev-parse", "--abbrev-ref", "HEAD"),
             cwd=repo_path,
+            env=GIT_ENV,
             stderr=subprocess.DEVNULL,
             text=True,
         ).strip()
@@ -136,123 +276,408 @@ def get_current_branch(repo_path: Path) -> str:
         return ""
 
 
-def get_main_branch(repo_path: Path) -> str:
-    """Get the main/default branch name (usually 'main' or 'master')."""
-    for branch in ["main", "master"]:
-        try:
-            subprocess.check_output(
-                ["git", "rev-parse", "--verify", f"origin/{branch}"],
-                cwd=repo_path,
+class _GitBatch:
+    """Long-running `git cat-file --batch-check` process for resolving refs.
+
+    Spawned lazily on first use and kept alive for the rest of the hook, so
+    each ref lookup is a pipe round trip instead of a fresh fork/exec.
+    """
+
+    def __init__(self, repo_path: str) -> None:
+        self.repo_path = repo_path
+        self._proc: subprocess.Popen[str] | None = None
+
+    def _process(self) -> subprocess.Popen[str]:
+        if self._proc is None:
+            self._proc = subprocess.Popen(
+                (GIT, "cat-file", "--batch-check=%(objectname)"),
+                cwd=self.repo_path,
+                env=GIT_ENV,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
+                text=True,
             )
-            return branch
-        except subprocess.CalledProcessError:
-            continue
-    return "main"
+        return self._proc
 
+    def resolve_many(self, refs: list[str]) -> list[str | None]:
+        """Resolve refs to SHAs in one round trip. Unknown refs map to None."""
+        try:
+            proc = self._process()
+            assert proc.stdin is not None and proc.stdout is not None
+            proc.stdin.write("".join(f"{ref}\n" for ref in refs))
+            proc.stdin.flush()
+            lines = [proc.stdout.readline().strip() for _ in refs]
+        except (OSError, ValueError):
+            return [None] * len(refs)
+        # Unresolvable input is echoed back as "<ref> missing" / "<ref> ambiguous"
+        return [line if line and " " not in line else None for line in lines]
+
+    def resolve(self, ref: str) -> str | None:
+        """Resolve a single ref to its SHA, or None if it doesn't exist."""
+        return self.resolve_many([ref])[0]
+
+    def exists(self, ref: str) -> bool:
+        """Check whether ref resolves to an object."""
+        return self.resolve(ref) is not None
+
+    def close(self) -> None:
+        """Stop the helper process (it exits on stdin EOF)."""
+        if self._proc is None:
+            return
+        try:
+            if self._proc.stdin:
+                self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        self._proc = None
 
-def check_conflicts_with_main(repo_path: Path, branch: str, main_branch: str) -> list[str]:
-    """Check if merging origin/main_branch would cause conflicts.
 
-    Returns list of conflicting file paths, or empty list if no conflicts.
-    """
-    if branch == main_branch:
-        return []
+_git_batches: dict[str, _GitBatch] = {}
+
 
+def git_batch(repo_path: str) -> _GitBatch:
+    """Get the shared ref-resolving helper for repo_path."""
+    if repo_path not in _git_batches:
+        _git_batches[repo_path] = _GitBatch(repo_path)
+    return _git_batches[repo_path]
+
+
+@atexit.register
+def _close_git_batches() -> None:
+    for batch in _git_batches.values():
+        batch.close()
+    _git_batches.clear()
+
+
+def repo_fingerprint(repo_path: str) -> list[Any]:
+    """Cheap marker that changes on commits, checkouts and staging: HEAD's SHA plus index mtime."""
     try:
-        # Fetch latest
-        subprocess.run(
-            ["git", "fetch", "origin", main_branch],
-            cwd=repo_path,
-            stderr=subprocess.DEVNULL,
-            stdout=subprocess.DEVNULL,
-            timeout=30,
-        )
+        index_mtime = os.stat(os.path.join(find_git_dir(repo_path), "index")).st_mtime_ns
+    except OSError:
+        index_mtime = None
+    return [git_batch(repo_path).resolve("HEAD"), index_mtime]
 
-        # Check if main is already merged in
-        result = subprocess.run(
-            ["git", "merge-base", "--is-ancestor", f"origin/{main_branch}", "HEAD"],
-            cwd=repo_path,
-        )
-        if result.returncode == 0:
-            return []  # Already up to date
 
-        # Use merge-tree to detect conflicts (Git 2.38+)
-        result = subprocess.run(
-            ["git", "merge-tree", "--write-tree", "HEAD", f"origin/{main_branch}"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
+@functools.cache
+def get_main_branch(repo_path: str) -> str:
+    """Get the main/default branch name (usually 'main' or 'master')."""
+    main_sha, master_sha = git_batch(repo_path).resolve_many(["origin/main", "origin/master"])
+    if main_sha:
+        return "main"
+    if master_sha:
+        return "master"
+    return "main"
+
+
+_running_preflights: list["Preflight"] = []
+
+
+@atexit.register
+def _kill_running_preflights() -> None:
+    # The script runs in its own session, so nothing else reaps it if the
+    # hook exits (e.g. on SIGTERM) while it is still going
+    for preflight in _running_preflights:
+        if preflight.proc is not None and preflight.proc.poll() is None:
+            preflight.kill()
+    _running_preflights.clear()
+
+
+def build_preflight_script(branch: str, main_branch: str, check_conflicts: bool) -> str:
+    """Build the bash script that gathers all pre-poll git state in one exec.
+
+    Sections are separated by NUL bytes, in order: `git status --porcelain`,
+    unpushed commit count, then (if check_conflicts) the post-fetch HEAD and
+    origin/main_branch SHAs, merge-tree output and its exit code. The fetch
+    runs in the background while the local sections are collected, and the
+    ancestor check skips merge-tree when main is already merged in.
+    """
+    remote_branch = shlex.quote(f"origin/{branch}")
+    remote_main = shlex.quote(f"origin/{main_branch}")
+    script = f"GIT={shlex.quote(GIT)}\n"
+    if check_conflicts:
+        script += f"\"$GIT\" fetch origin {shlex.quote(main_branch)} >/dev/null 2>&1 &\n"
+    script += (
+        "\"$GIT\" status --porcelain 2>/dev/null\n"
+        "printf '\\0'\n"
+        f"if \"$GIT\" rev-parse --verify -q {remote_branch} >/dev/null; then\n"
+        f"  \"$GIT\" rev-list --count {remote_branch}..HEAD 2>/dev/null\n"
+        "fi\n"
+        "printf '\\0'\n"
+    )
+    if check_conflicts:
+        script += (
+            "wait\n"
+            f"\"$GIT\" rev-parse HEAD {remote_main} 2>/dev/null\n"
+            "printf '\\0'\n"
+            f"if \"$GIT\" merge-base --is-ancestor {remote_main} HEAD 2>/dev/null; then\n"
+            "  printf '\\0%s' 0\n"
+            "else\n"
+            # Use merge-tree to detect conflicts (Git 2.38+)
+            f"  \"$GIT\" merge-tree --write-tree --name-only -z --no-messages "
+            f"HEAD {remote_main} 2>/dev/null\n"
+            "  printf '\\0%s' \"$?\"\n"
+            "fi\n"
         )
+    return script
 
-        if result.returncode == 0:
-            return []  # No conflicts
 
-        # Parse conflicting files from output
-        # Format includes lines like "CONFLICT (content): Merge conflict in <path>"
-        conflicts = []
-        for line in result.stdout.split("\n"):
-            if line.startswith("CONFLICT") and " in " in line:
-                path = line.split(" in ", 1)[-1].strip()
-                conflicts.append(path)
+def parse_merge_tree_conflicts(fields: list[bytes], returncode: int) -> list[str]:
+    """Extract conflicting file paths from `git merge-tree --name-only -z` output.
 
-        return conflicts if conflicts else ["(unable to determine specific files)"]
+    fields is the NUL-split output: the merged tree OID followed by one
+    entry per conflicted path.
+    """
+    if returncode == 0:
+        return []  # No conflicts
 
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
-        return []  # Can't check, assume no conflicts
+    paths = dict.fromkeys(field.decode(errors="replace") for field in fields[1:] if field)
+    return list(paths) if paths else ["(unable to determine specific files)"]
 
 
-def get_uncommitted_changes(repo_path: Path) -> str:
-    """Get git status --porcelain output (empty if clean)."""
+def load_cached_conflicts(key: list[str]) -> list[str] | None:
+    """Get the conflict list cached for a (HEAD, origin/main) SHA pair, if any."""
     try:
-        return subprocess.check_output(
-            ["git", "status", "--porcelain"],
-            cwd=repo_path,
-            stderr=subprocess.DEVNULL,
-            text=True,
-        ).strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return ""
+        cached = json.loads(MERGE_CACHE_FILE.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    if isinstance(cached, dict) and cached.get("key") == key:
+        return cached.get("conflicts", [])
+    return None
 
 
-def get_unpushed_commit_count(repo_path: Path, branch: str) -> int:
-    """Count local commits not yet on origin/{branch}."""
+def save_cached_conflicts(key: list[str], conflicts: list[str]) -> None:
+    """Atomically replace the merge cache with the result for key."""
     try:
-        remote_branch = f"origin/{branch}"
-        subprocess.check_output(
-            ["git", "rev-parse", "--verify", remote_branch],
-            cwd=repo_path,
-            stderr=subprocess.DEVNULL,
+        fd, tmp_path = tempfile.mkstemp(
+            dir=MERGE_CACHE_FILE.parent, prefix=f"{MERGE_CACHE_FILE.name}."
         )
-        output = subprocess.check_output(
-            ["git", "rev-list", "--count", f"{remote_branch}..HEAD"],
-            cwd=repo_path,
-            stderr=subprocess.DEVNULL,
-            text=True,
-        ).strip()
-        return int(output)
-    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
-        return 0
+        with os.fdopen(fd, "w") as f:
+            json.dump({"key": key, "conflicts": conflicts}, f)
+        os.replace(tmp_path, MERGE_CACHE_FILE)
+    except OSError:
+        pass
+
+
+class Preflight:
+    """Collect working tree, unpushed and merge conflict state in a single exec.
+
+    The script starts running on construction, so callers can do other work
+    (e.g. network requests) while git is busy, then collect it with result().
+
+    The fetch + merge-tree probe is skipped when neither HEAD nor the local
+    origin/main_branch has moved since the last probe; the cached conflict
+    list is reused instead.
+    """
+
+    def __init__(self, repo_path: str, branch: str, main_branch: str):
+        self.cached_conflicts = None
+        if branch != main_branch:
+            key = git_batch(repo_path).resolve_many(["HEAD", f"origin/{main_branch}"])
+            if all(key):
+                self.cached_conflicts = load_cached_conflicts(key)
+        self.check_conflicts = branch != main_branch and self.cached_conflicts is None
+
+        script = build_preflight_script(branch, main_branch, self.check_conflicts)
+        try:
+            self.proc: subprocess.Popen[bytes] | None = subprocess.Popen(
+                ("bash", "-c", script),
+                cwd=repo_path,
+                env=GIT_ENV,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                # Own process group, so a timeout also kills the background fetch
+                start_new_session=True,
+            )
+        except OSError:
+            self.proc = None
+        _running_preflights.append(self)
+
+    def kill(self) -> None:
+        """Kill the script's whole process group, background fetch included."""
+        if self.proc is None:
+            return
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        self.proc.wait()
+
+    def _output(self) -> bytes:
+        if self.proc is None:
+            return b""
+        try:
+            return self.proc.communicate(timeout=PREFLIGHT_TIMEOUT)[0]
+        except subprocess.TimeoutExpired as e:
+            self.kill()
+            return e.stdout or b""  # Fetch hung - keep whatever finished before it
+        except (OSError, subprocess.SubprocessError):
+            return b""
+
+    def result(self) -> dict[str, Any]:
+        """Wait for the script and parse its output.
+
+        Returns: {
+            'uncommitted': str,      # first MAX_LISTED_CHANGES lines of git status --porcelain
+            'uncommitted_count': int,  # total number of changed/untracked entries
+            'unpushed': int,         # local commits not yet on origin/{branch}
+            'conflicts': list[str],  # files conflicting with origin/{main_branch}
+        }
+        """
+        stdout = self._output()
+
+        raw_status, *rest = stdout.split(b"\x00")
+        sections = [part.decode(errors="replace") for part in rest[:2]]
+        sections += [""] * (2 - len(sections))
+        count, shas = sections
+        # merge-tree -z terminates every field with NUL, so a complete conflict
+        # section always ends with an empty field followed by the exit code.
+        merge_tail = rest[2:]
+        merge_done = len(merge_tail) >= 2 and not merge_tail[-2] and merge_tail[-1].isdigit()
+
+        # Porcelain quotes unusual paths, so each entry is exactly one line. Count
+        # on the raw bytes and only decode the lines we are going to show.
+        uncommitted_count = raw_status.count(b"\n")
+        listed = raw_status.split(b"\n", MAX_LISTED_CHANGES)[:MAX_LISTED_CHANGES]
+        uncommitted = b"\n".join(listed).decode(errors="replace").rstrip()
+        if uncommitted_count > MAX_LISTED_CHANGES:
+            uncommitted += f"\n... and {uncommitted_count - MAX_LISTED_CHANGES} more"
+
+        try:
+            unpushed = int(count.strip() or 0)
+        except ValueError:
+            unpushed = 0
+
+        conflicts = self.cached_conflicts or []
+        if self.check_conflicts and merge_done:
+            conflicts = parse_merge_tree_conflicts(merge_tail[:-2], int(merge_tail[-1]))
+            probed_key = shas.split()
+            if len(probed_key) == 2:
+                save_cached_conflicts(probed_key, conflicts)
+
+        return {
+            "uncommitted": uncommitted,
+            "uncommitted_count": uncommitted_count,
+            "unpushed": unpushed,
+            "conflicts": conflicts,
+        }
+
+
+_differ_conn: http.client.HTTPConnection | None = None
+
+
+def _differ_connection() -> http.client.HTTPConnection:
+    """Get the shared connection to the differ server, opening it if needed."""
+    global _differ_conn
+    if _differ_conn is None:
+        url = urllib.parse.urlsplit(DIFFER_URL)
+        conn_class = (
+            http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        )
+        _differ_conn = conn_class(url.hostname or "localhost", url.port, timeout=30)
+    return _differ_conn
+
+
+def _reset_differ_connection() -> None:
+    global _differ_conn
+    if _differ_conn is not None:
+        _differ_conn.close()
+    _differ_conn = None
 
 
-def api_get(path: str) -> dict[str, Any]:
-    """GET from differ REST API. Returns empty dict on any error."""
+_response_cache: dict[str, tuple[str, dict[str, Any]]] = {}
+
+
+def _response_cache_file(path: str) -> Path:
+    digest = hashlib.blake2b(f"{DIFFER_URL}{path}".encode(), digest_size=8).hexdigest()
+    return RESPONSE_CACHE_DIR / f"{digest}.json"
+
+
+def load_cached_response(path: str) -> tuple[str, dict[str, Any]] | None:
+    """Get the (etag, body) last saved for path, from memory or disk."""
+    if path not in _response_cache:
+        try:
+            cached = json.loads(_response_cache_file(path).read_text())
+            _response_cache[path] = (cached["etag"], cached["body"])
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+    return _response_cache[path]
+
+
+def save_cached_response(path: str, etag: str, body: dict[str, Any]) -> None:
+    """Remember body and its ETag for path, atomically replacing the disk copy."""
+    _response_cache[path] = (etag, body)
+    cache_file = _response_cache_file(path)
     try:
-        with urllib.request.urlopen(f"{DIFFER_URL}{path}", timeout=30) as resp:
-            return json.loads(resp.read().decode())
-    except (urllib.error.URLError, json.JSONDecodeError, OSError):
-        return {}
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=f"{cache_file.name}.")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"etag": etag, "body": body}, f)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        pass
+
+
+def api_get(path: str, timeout: float = 30, conditional: bool = False) -> dict[str, Any]:
+    """GET from differ REST API. Returns empty dict on any error.
+
+    Requests share one persistent keep-alive connection for the life of the
+    hook; if the server has dropped it in the meantime we reconnect and
+    retry once.
+
+    With conditional, the last response for path is kept (across hook runs)
+    and revalidated with If-None-Match; a 304 returns it without re-reading.
+    """
+    url_path = urllib.parse.urlsplit(DIFFER_URL).path.rstrip("/") + path
+    headers = {"Connection": "keep-alive"}
+    cached = load_cached_response(path) if conditional else None
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    for attempt in range(2):
+        conn = _differ_connection()
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            _metrics["api_calls"] += 1
+            conn.request("GET", url_path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+            if resp.status == 304 and cached:
+                _metrics["not_modified"] += 1
+                return cached[1]
+            if resp.status != 200:
+                return {}
+            data = json.loads(body)
+            etag = resp.getheader("ETag")
+            if conditional and etag:
+                save_cached_response(path, etag, data)
+            return data
+        except (http.client.RemoteDisconnected, ConnectionError):
+            # Idle socket closed server-side (e.g. keep-alive timeout)
+            _reset_differ_connection()
+            if attempt:
+                return {}
+        except (http.client.HTTPException, json.JSONDecodeError, OSError):
+            _reset_differ_connection()
+            return {}
+    return {}
 
 
 def find_session_for_branch(repo_path: str, branch: str) -> dict[str, Any]:
     """Find best session for repo/branch. Prefers open GitHub PRs over closed/merged."""
-    sessions = api_get("/api/sessions")
-    repo_name = Path(repo_path).name
+    # Server filters by branch; repo matching stays here since GitHub sessions
+    # may only identify the repo by project name
+    sessions = api_get(f"/api/sessions?branch={urllib.parse.quote(branch, safe='')}")
+    repo_name = os.path.basename(repo_path)
 
     local_session = None
-    github_sessions: list[dict[str, Any]] = []
+    # (is_open, pr_number, -position, session): open PRs beat merged/closed,
+    # then the highest PR number wins, then whichever the server listed first
+    github_sessions: list[tuple[int, int, int, dict[str, Any]]] = []
 
-    for s in sessions.get("sessions", []):
+    for position, s in enumerate(sessions.get("sessions", [])):
         s_branch = s.get("branch", "")
         s_project = s.get("project", "")
         s_type = s.get("session-type", "")
@@ -265,35 +690,32 @@ def find_session_for_branch(repo_path: str, branch: str) -> dict[str, Any]:
 
         if matches_repo and s_branch == branch:
             if s_type == "github":
-                github_sessions.append(s)
+                is_open = 1 if s.get("state", "").lower() == "open" else 0
+                pr_num = s.get("github-pr-number", 0) or 0
+                github_sessions.append((is_open, pr_num, -position, s))
             elif s_type == "local" and not local_session:
                 local_session = s
 
     if github_sessions:
-        # Prefer open PRs over merged/closed, then highest PR number
-        def session_priority(s: dict[str, Any]) -> tuple[int, int]:
-            state = s.get("state", "").lower()
-            pr_num = s.get("github-pr-number", 0) or 0
-            is_open = 1 if state == "open" else 0
-            return (is_open, pr_num)
-
-        github_sessions.sort(key=session_priority, reverse=True)
-        return github_sessions[0]
+        return max(github_sessions)[3]
 
     return local_session or {}
 
 
-def get_pending_feedback(session_id: str) -> dict[str, Any]:
-    """Get pending feedback: unresolved comments and CI status.
+def get_pending_feedback(encoded_id: str) -> dict[str, Any]:
+    """Get pending feedback: unresolved comments, CI status and PR state.
+
+    encoded_id is the session id, already URL-quoted by the caller.
 
     Returns: {
         'comment_count': int,
+        'comments': list[dict],  # [{file, line, author, text}, ...] per unresolved thread
         'ci_state': str | None,  # 'success', 'failure', 'pending', 'error', 'unknown'
-        'ci_failures': list[dict]  # [{name, state, url}, ...]
+        'ci_failures': list[dict],  # [{name, state, url}, ...]
+        'pr_state': str | None,  # 'merged', 'closed', 'open', or None if unknown
     }
     """
-    encoded_id = urllib.parse.quote(session_id, safe="")
-    pending = api_get(f"/api/sessions/{encoded_id}/pending")
+    pending = api_get(f"/api/sessions/{encoded_id}/pending", conditional=True)
 
     comments = pending.get("comments", [])
     ci = pending.get("ci", {})
@@ -309,18 +731,28 @@ def get_pending_feedback(session_id: str) -> dict[str, Any]:
 
     return {
         "comment_count": len(comments),
+        "comments": [
+            {k: c.get(k) for k in ("file", "line", "author", "text")} for c in comments
+        ],
         "ci_state": ci_state,
         "ci_failures": ci_failures,
+        "pr_state": (pending.get("state") or "").lower() or None,
     }
 
 
-def get_pr_status(session_id: str) -> str | None:
-    """Get PR state: 'merged', 'closed', 'open', or None if unknown."""
-    encoded_id = urllib.parse.quote(session_id, safe="")
-    session = api_get(f"/api/sessions/{encoded_id}")
-    if not session:
-        return None
-    return session.get("state", "").lower() or None
+def watch_session(encoded_id: str, since_seq: int | str, timeout: float) -> dict[str, Any]:
+    """Long-poll until the session's feedback may have changed or timeout seconds pass.
+
+    encoded_id is the session id, already URL-quoted by the caller. since_seq
+    "latest" skips events the server buffered before this call.
+    Returns: {'events': list, 'next-seq': int, 'timed-out': bool}, or an
+    empty dict if the watch endpoint is unavailable.
+    """
+    return api_get(
+        f"/api/sessions/{encoded_id}/watch?since_seq={since_seq}"
+        f"&timeout_ms={int(timeout * 1000)}",
+        timeout=timeout + 30,
+    )
 
 
 # =============================================================================
@@ -328,13 +760,31 @@ def get_pr_status(session_id: str) -> str | None:
 # =============================================================================
 
 
+def format_comment_summary(comment: dict[str, Any]) -> str:
+    """One-line `file:line (author): first line` summary of a comment."""
+    location = comment.get("file") or "general"
+    if comment.get("line"):
+        location += f":{comment['line']}"
+    first_line = (comment.get("text") or "").strip().split("\n", 1)[0]
+    if len(first_line) > 120:
+        first_line = first_line[:117] + "..."
+    return f"{location} ({comment.get('author') or 'unknown'}): {first_line}"
+
+
 def block_for_pending_comments(
-    pr_info: str, count: int, session_id: str, repo_path: str
+    pr_info: str, comments: list[dict[str, Any]], session_id: str, repo_path: str
 ) -> NoReturn:
-    """Block with instructions to address review comments."""
+    """Block with instructions to address review comments, listing the ones already fetched."""
+    comment_list = "\n".join(
+        f"  • {format_comment_summary(c)}" for c in comments[:MAX_LISTED_COMMENTS]
+    )
+    if len(comments) > MAX_LISTED_COMMENTS:
+        comment_list += f"\n  ... and {len(comments) - MAX_LISTED_COMMENTS} more"
+
     block(
-        f"ACTION REQUIRED: Address {count} unresolved comment(s) on {pr_info}.\n"
-        "1. Call get_pending_feedback to see the comments\n"
+        f"ACTION REQUIRED: Address {len(comments)} unresolved comment(s) on {pr_info}.\n\n"
+        f"{comment_list}\n\n"
+        "1. Call get_pending_feedback for the full threads and comment ids\n"
         "2. Address each comment by making the necessary code changes\n"
         f'3. Call: request_review(session_id="{session_id}", repo_path="{repo_path}")\n'
         "4. Call resolve_comment for each issue you've addressed\n"
@@ -382,15 +832,13 @@ def block_for_merge_conflicts(
 
 
 def require_clean_working_tree(
-    repo_path: Path, branch: str, session_id: str, pr_info: str
+    preflight: dict[str, Any], session_id: str, pr_info: str, repo_path: str
 ) -> None:
     """Block if there are uncommitted changes or unpushed commits."""
-    uncommitted = get_uncommitted_changes(repo_path)
-    if uncommitted:
-        change_lines = [line for line in uncommitted.split("\n") if line.strip()]
+    if preflight["uncommitted_count"]:
         block(
-            f"ACTION REQUIRED: Handle {len(change_lines)} uncommitted change(s):\n"
-            f"```\n{uncommitted}\n```\n"
+            f"ACTION REQUIRED: Handle {preflight['uncommitted_count']} uncommitted change(s):\n"
+            f"```\n{preflight['uncommitted']}\n```\n"
             "For each file, decide:\n"
             "• **Commit** if it's intentional work (source code, config, docs)\n"
             "• **Add to .gitignore** if it's generated/cache files (__pycache__/, .pyc, "
@@ -399,7 +847,7 @@ def require_clean_working_tree(
             "Then run `git add` and `git commit` for files that belong in the PR."
         )
 
-    unpushed = get_unpushed_commit_count(repo_path, branch)
+    unpushed = preflight["unpushed"]
     if unpushed > 0:
         block(
             f"ACTION REQUIRED: Push {unpushed} commit(s) to {pr_info} now.\n"
@@ -444,38 +892,141 @@ def require_github_session(repo_path: str, branch: str) -> dict[str, Any]:
 # =============================================================================
 
 
-def poll_for_comments(session_id: str, pr_info: str, repo_path: str) -> None:
-    """Poll for review comments and CI status. Blocks on issues, exits when PR closed/merged."""
-    idle_start = time.time()
+def idle_file(repo_path: str, encoded_id: str) -> str:
+    """Path of the file holding a session's idle start time."""
+    return os.path.join(find_git_dir(repo_path), "differ", f"{encoded_id}.idle")
 
-    while True:
-        feedback = get_pending_feedback(session_id)
 
-        # Check for unresolved comments first
-        if feedback["comment_count"] > 0:
-            block_for_pending_comments(
-                pr_info, feedback["comment_count"], session_id, repo_path
-            )
+def load_idle_start(path: str, head: str | None) -> float:
+    """Get the persisted idle start time, starting a fresh idle period now if
+    there is none yet or HEAD has moved since it was recorded (new work).
+    """
+    try:
+        with open(path) as f:
+            timestamp, _, saved_head = f.read().partition(" ")
+        if saved_head.strip() == (head or ""):
+            return float(timestamp)
+    except (OSError, ValueError):
+        pass
+    now = time.time()
+    save_idle_start(path, now, head)
+    return now
+
+
+def save_idle_start(path: str, timestamp: float, head: str | None) -> None:
+    """Persist the idle start time and the HEAD it applies to, ignoring unwritable git dirs."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"{timestamp} {head or ''}")
+    except OSError:
+        pass
+
+
+def interrupt_agent() -> None:
+    """Send SIGINT to the agent process, as the agent would with `kill -INT $PPID`."""
+    agent_pid = os.getppid()
+    if agent_pid <= 1:
+        return  # Orphaned - the agent is already gone
+    print(f"Interrupting agent (pid {agent_pid}).", file=sys.stderr)
+    try:
+        os.kill(agent_pid, signal.SIGINT)
+    except OSError:
+        pass
 
-        # Check for CI failures
-        if feedback["ci_failures"]:
-            block_for_ci_failures(
-                pr_info, feedback["ci_failures"], session_id, repo_path
-            )
 
-        pr_status = get_pr_status(session_id)
-        if pr_status in ["merged", "closed"]:
-            print(f"PR {pr_status}.", file=sys.stderr)
-            block(
-                f"ACTION REQUIRED: End this session - {pr_info} has been {pr_status}.\n\n"
-                "Run: `kill -INT $PPID`"
-            )
+def poll_once(
+    feedback: dict[str, Any], session_id: str, pr_info: str, repo_path: str, idle_path: str
+) -> None:
+    """Act on one feedback snapshot: block if it needs attention, else return.
+
+    Apart from block()'s repeat tracking, the only state it touches is the
+    persisted idle start, so a single check can run outside the polling loop.
+    """
+    if feedback["comment_count"] > 0 or feedback["ci_failures"]:
+        save_idle_start(idle_path, time.time(), git_batch(repo_path).resolve("HEAD"))
+
+    # Check for unresolved comments first
+    if feedback["comment_count"] > 0:
+        block_for_pending_comments(pr_info, feedback["comments"], session_id, repo_path)
+
+    # Check for CI failures
+    if feedback["ci_failures"]:
+        block_for_ci_failures(pr_info, feedback["ci_failures"], session_id, repo_path)
+
+    pr_status = feedback["pr_state"]
+    if pr_status in ["merged", "closed"]:
+        print(f"PR {pr_status}.", file=sys.stderr)
+        if is_auto_exit_enabled():
+            interrupt_agent()
+        # Still block, in case the interrupt didn't reach the agent
+        block(
+            f"ACTION REQUIRED: End this session - {pr_info} has been {pr_status}.\n\n"
+            "Run: `kill -INT $PPID`"
+        )
 
-        if time.time() - idle_start >= MAX_IDLE:
+
+def poll_for_comments(
+    session_id: str,
+    pr_info: str,
+    repo_path: str,
+    initial_feedback: dict[str, Any] | None = None,
+    fetched_at: float = 0.0,
+    since_seq: int | str = "latest",
+) -> None:
+    """Poll for review comments and CI status. Blocks on issues, exits when PR closed/merged.
+
+    Between checks, waits on the differ watch endpoint so the next check
+    happens as soon as feedback changes. If the server doesn't support
+    watching, falls back to sleeping with exponential backoff from
+    MIN_POLL_INTERVAL up to POLL_INTERVAL.
+
+    A watch that times out without events means nothing changed, so the
+    last feedback is reused for up to FEEDBACK_TTL instead of re-fetched.
+
+    Idle time is counted from the last time feedback was found or HEAD
+    moved, persisted in the git dir so the 12h limit spans hook invocations.
+
+    initial_feedback, if given, is a get_pending_feedback result the caller
+    already fetched at fetched_at; it is used for the first check. since_seq
+    is where watching resumes, and must be taken before that fetch so no
+    event between the two is missed.
+    """
+    interval = MIN_POLL_INTERVAL
+    encoded_id = urllib.parse.quote(session_id, safe="")
+    idle_path = idle_file(repo_path, encoded_id)
+    idle_start = load_idle_start(idle_path, git_batch(repo_path).resolve("HEAD"))
+    feedback = initial_feedback
+    kept_after_watch = False
+
+    while True:
+        _metrics["iterations"] += 1
+        if feedback is None or time.time() - fetched_at >= FEEDBACK_TTL:
+            feedback = get_pending_feedback(encoded_id)
+            fetched_at = time.time()
+        elif kept_after_watch:
+            _metrics["feedback_reused"] += 1
+
+        poll_once(feedback, session_id, pr_info, repo_path, idle_path)
+
+        # Never wait past the idle budget, so the 12h exit fires on time
+        remaining = MAX_IDLE - (time.time() - idle_start)
+        if remaining <= 0:
             print("12h idle. Ending.", file=sys.stderr)
             sys.exit(1)
 
-        time.sleep(POLL_INTERVAL)
+        watch = watch_session(encoded_id, since_seq, min(WATCH_TIMEOUT, remaining))
+        if "next-seq" in watch:
+            since_seq = watch["next-seq"]
+            interval = MIN_POLL_INTERVAL
+            # GitHub sessions watch their whole repo; other PRs' events don't matter
+            if any(e.get("session-id") == session_id for e in watch.get("events", [])):
+                feedback = None
+            kept_after_watch = feedback is not None
+        else:
+            feedback = None
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, POLL_INTERVAL)
 
 
 # =============================================================================
@@ -483,40 +1034,75 @@ def poll_for_comments(session_id: str, pr_info: str, repo_path: str) -> None:
 # =============================================================================
 
 
+def _exit_on_signal(signum: int, _frame: Any) -> NoReturn:
+    sys.exit(128 + signum)
+
+
 def main() -> None:
+    global _verdict, _metrics_session_id
+
+    # Claude Code ends an idle hook with SIGTERM at its timeout; exit normally
+    # then so atexit handlers (metrics, git helper cleanup) still run
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+
     if is_disabled():
         allow()
 
     hook_input = read_hook_input()
-    cwd = Path(hook_input.get("cwd", ".")).resolve()
+    cwd = os.path.realpath(hook_input.get("cwd") or ".")
 
-    if not is_git_repo(cwd):
+    repo_path = find_repo_root(cwd)
+    if repo_path is None:
         print("Not in a git repository", file=sys.stderr)
         allow()
 
-    repo_path = find_repo_root(cwd)
+    # Hooks often fire back to back; repeat a fresh verdict instead of rechecking
+    key = f"{cwd}\0{hook_input.get('session_id', '')}"
+    verdict_path = VERDICT_DIR / hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    fingerprint = repo_fingerprint(repo_path)
+    replay_verdict(verdict_path, fingerprint)
+    _verdict = (verdict_path, fingerprint)
+
     branch = get_current_branch(repo_path)
 
     if not branch:
         print("Could not determine current branch", file=sys.stderr)
         allow()
 
-    session = require_github_session(str(repo_path), branch)
+    session = require_github_session(repo_path, branch)
     session_id = session.get("id", "")
     if not session_id:
         allow()
+    _metrics_session_id = session_id
 
     pr_number = session.get("github-pr-number")
     pr_info = f"PR #{pr_number}" if pr_number else "the PR"
 
-    # Check for merge conflicts with main branch
+    # One exec gathers merge conflicts, working tree status and unpushed commits.
+    # Fetch the first feedback snapshot while it runs.
     main_branch = get_main_branch(repo_path)
-    conflicts = check_conflicts_with_main(repo_path, branch, main_branch)
-    if conflicts:
-        block_for_merge_conflicts(main_branch, conflicts, session_id, str(repo_path))
+    running_preflight = Preflight(repo_path, branch, main_branch)
+    encoded_id = urllib.parse.quote(session_id, safe="")
+    # Peek at the event stream position first, so events arriving after the
+    # snapshot still wake the first watch
+    since_seq = watch_session(encoded_id, "latest", 0).get("next-seq", "latest")
+    feedback = get_pending_feedback(encoded_id)
+    fetched_at = time.time()
+    preflight = running_preflight.result()
+    if preflight["conflicts"]:
+        block_for_merge_conflicts(
+            main_branch, preflight["conflicts"], session_id, repo_path
+        )
 
-    require_clean_working_tree(repo_path, branch, session_id, pr_info)
-    poll_for_comments(session_id, pr_info, str(repo_path))
+    require_clean_working_tree(preflight, session_id, pr_info, repo_path)
+    poll_for_comments(
+        session_id,
+        pr_info,
+        repo_path,
+        initial_feedback=feedback,
+        fetched_at=fetched_at,
+        since_seq=since_seq,
+    )
 
 
 if __name__ == "__main__":